@@ -0,0 +1,64 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+
+import pytest
+
+# Every test runs against a private in-memory database and scratch files, never instance/
+TEST_INSTANCE = tempfile.mkdtemp(prefix='cards-tests-')
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['SCRYFALL_API_URL'] = 'http://scryfall.invalid'
+os.environ['SCRYFALL_MIRROR_PATH'] = os.path.join(TEST_INSTANCE, 'scryfall.db')
+os.environ['SCRYFALL_CACHE_PATH'] = os.path.join(TEST_INSTANCE, 'scryfall_cache.db')
+os.environ['CARD_NAME_INDEX_PATH'] = os.path.join(TEST_INSTANCE, 'card_names.npz')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as cards_app
+
+
+def bulk_card(name, set_code, collector_number, released_at, usd=None, oracle_id=None):
+    """Minimal Scryfall card object, as found in a bulk-data file"""
+    return {
+        'object': 'card', 'id': f'{set_code}-{collector_number}', 'oracle_id': oracle_id or f'oracle-{name}',
+        'name': name, 'set': set_code, 'set_name': set_code.upper(), 'collector_number': collector_number,
+        'released_at': released_at, 'rarity': 'rare', 'prices': {'usd': usd},
+        'image_uris': {'normal': f'https://cards.scryfall.io/{set_code}/{collector_number}.jpg'},
+    }
+
+
+@pytest.fixture
+def app_context():
+    """App context with a freshly migrated, empty database"""
+    with cards_app.app.app_context():
+        cards_app.migrate_database()
+        yield cards_app
+        cards_app.db.session.remove()
+        cards_app.db.drop_all()
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    """Scryfall mirror imported from a small bulk file"""
+    bulk_path = tmp_path / 'bulk.json'
+    bulk_path.write_text(json.dumps([
+        bulk_card('Lightning Bolt', 'lea', '161', '1993-08-05', '450.00'),
+        bulk_card('Lightning Bolt', 'm10', '146', '2009-07-17', '1.50'),
+        bulk_card('Black Lotus', 'lea', '232', '1993-08-05', '20000.00'),
+        bulk_card('Fire // Ice', 'apc', '128', '2001-06-04', '0.40'),
+    ]))
+    mirror_path = str(tmp_path / 'scryfall.db')
+    cards_app.import_scryfall_bulk(str(bulk_path), mirror_path)
+    return cards_app.ScryfallMirror(mirror_path)
+
+
+@pytest.fixture
+def scryfall_stub(mirror):
+    """Stub Scryfall API answering from the mirror, on a free local port"""
+    server = cards_app.make_scryfall_stub(mirror)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,80 @@
+import random
+
+import app as cards_app
+
+
+def reference_levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+NAMES = [
+    'Lightning Bolt', 'Lightning Helix', 'Black Lotus', 'Fire // Ice', 'Wear // Tear',
+    'Counterspell', 'Llanowar Elves', 'Serra Angel', 'Ancestral Recall', 'Time Walk',
+]
+
+
+def test_levenshtein_known_distances():
+    assert cards_app.levenshtein('', '') == 0
+    assert cards_app.levenshtein('', 'abc') == 3
+    assert cards_app.levenshtein('kitten', 'sitting') == 3
+    assert cards_app.levenshtein('flaw', 'lawn') == 2
+    assert cards_app.levenshtein('lightning bolt', 'lightnlng bo1t') == 2
+
+
+def test_levenshtein_matches_reference():
+    rng = random.Random(8)
+    for _ in range(2000):
+        # Short alphabets force many repeated characters; lengths cross the 64-bit word size
+        a = ''.join(rng.choice('abc d') for _ in range(rng.randrange(0, 90)))
+        b = ''.join(rng.choice('abc d') for _ in range(rng.randrange(0, 90)))
+        assert cards_app.levenshtein(a, b) == reference_levenshtein(a, b), (a, b)
+        assert cards_app.levenshtein(b, a) == cards_app.levenshtein(a, b)
+
+
+def test_correct_fixes_ocr_noise(app_context):
+    index = cards_app.CardNameIndex.build(NAMES)
+    assert index.correct('Lightnlng Bo1t') == 'Lightning Bolt'
+    assert index.correct('LIGHTNING HELIX!') == 'Lightning Helix'
+    assert index.correct('Serra Ange1') == 'Serra Angel'
+
+
+def test_correct_rejects_distant_strings(app_context):
+    index = cards_app.CardNameIndex.build(NAMES)
+    assert index.correct('Completely Unrelated') is None
+    assert index.correct('') is None
+    # Three edits from 'time walk' is more than 30% of the 7-character query
+    assert index.correct('Tiwe Wa') is None
+    assert index.correct('Tiwe Walk') == 'Time Walk'
+    assert index.correct('Ixxx') is None
+
+
+def test_faces_of_split_cards_map_to_the_full_name(app_context):
+    index = cards_app.CardNameIndex.build(NAMES)
+    assert index.correct('Fire') == 'Fire // Ice'
+    assert index.correct('Tear') == 'Wear // Tear'
+    assert index.correct('Fire // Ice') == 'Fire // Ice'
+    assert index.lookup('Ice', k=1) == [('Fire // Ice', 0)]
+
+
+def test_lookup_ranks_by_distance(app_context):
+    index = cards_app.CardNameIndex.build(NAMES)
+    matches = index.lookup('Lightning', k=2)
+    assert [name for name, _ in matches] == ['Lightning Bolt', 'Lightning Helix']
+    assert matches[0][1] <= matches[1][1]
+
+
+def test_save_load_round_trip(app_context, tmp_path):
+    index = cards_app.CardNameIndex.build(NAMES)
+    path = str(tmp_path / 'names.npz')
+    index.save(path)
+    loaded = cards_app.CardNameIndex.load(path)
+    assert loaded.names == index.names
+    assert loaded.entry_keys == index.entry_keys
+    for query in ['Lightnlng Bo1t', 'Fire', 'Counterspel', 'nothing like it']:
+        assert loaded.lookup(query) == index.lookup(query)
@@ -0,0 +1,51 @@
+def summary_drift(app_context):
+    with app_context.db.engine.connect() as connection:
+        return app_context.repair_collection_summaries(connection, dry_run=True)
+
+
+def new_card(app_context, name, price='2.50'):
+    return app_context.Card(card_name=name, set_name='Alpha', rarity='rare', price_usd=price)
+
+
+def test_cards_appended_through_relationship_are_counted(app_context):
+    db = app_context.db
+    owner = app_context.User(username='owner', password='!')
+    db.session.add(owner)
+    db.session.commit()
+    
+    owner.cards.append(new_card(app_context, 'Black Lotus'))
+    db.session.commit()
+    
+    # The owner is new too, so neither id exists before the flush
+    newcomer = app_context.User(username='newcomer', password='!')
+    newcomer.cards.append(new_card(app_context, 'Mox Pearl', '1.00'))
+    db.session.add(newcomer)
+    db.session.commit()
+    
+    assert summary_drift(app_context) == []
+    summary = app_context.collection_summary(owner.id)
+    assert summary['count'] == 1
+    assert app_context.collection_summary(newcomer.id)['count'] == 1
+    
+    # delete-orphan: removing the card from the relationship deletes it
+    owner.cards.remove(owner.cards[0])
+    db.session.commit()
+    assert summary_drift(app_context) == []
+    assert app_context.collection_summary(owner.id)['count'] == 0
+
+
+def test_card_moved_through_relationship_is_recounted(app_context):
+    db = app_context.db
+    giver = app_context.User(username='giver', password='!')
+    taker = app_context.User(username='taker', password='!')
+    card = new_card(app_context, 'Time Walk')
+    giver.cards.append(card)
+    db.session.add_all([giver, taker])
+    db.session.commit()
+    
+    card.user = taker
+    db.session.commit()
+    
+    assert summary_drift(app_context) == []
+    assert app_context.collection_summary(giver.id)['count'] == 0
+    assert app_context.collection_summary(taker.id)['count'] == 1
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import app as cards_app
+
+
+def test_lttb_keeps_endpoints_and_order():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.sin(x / 40) * 10
+    selected = cards_app.lttb_indices(x, y, 50)
+    assert len(selected) == 50
+    assert selected[0] == 0 and selected[-1] == 999
+    assert np.all(np.diff(selected) > 0)
+
+
+def test_lttb_keeps_spikes():
+    x = np.arange(500, dtype=np.float64)
+    y = np.ones(500)
+    y[123] = 50
+    y[321] = -50
+    selected = cards_app.lttb_indices(x, y, 20)
+    assert 123 in selected and 321 in selected
+
+
+def test_lttb_short_series_unchanged():
+    x = np.arange(10, dtype=np.float64)
+    assert cards_app.lttb_indices(x, x, 10).tolist() == list(range(10))
+    assert cards_app.lttb_indices(x, x, 50).tolist() == list(range(10))
+    assert cards_app.lttb_indices(x, x, 2).tolist() == list(range(10))
+
+
+def add_user_with_prices(app_context, histories):
+    """histories: {card name: [(days ago, price)]}, oldest first; returns the user id"""
+    db = app_context.db
+    user = app_context.User(username='collector', password='!')
+    db.session.add(user)
+    db.session.commit()
+    now = datetime.utcnow()
+    for name, points in histories.items():
+        card = app_context.Card(user_id=user.id, card_name=name, set_name='Alpha', rarity='rare',
+                                price_usd=f"{points[-1][1]:.2f}" if points else 'N/A')
+        db.session.add(card)
+        db.session.flush()
+        app_context.add_price_points([{'card_id': card.id, 'price_usd': price,
+                                       'tracked_at': now - timedelta(days=days_ago)}
+                                      for days_ago, price in points])
+    db.session.commit()
+    return user.id
+
+
+def reference_values(app_context, user_id, days):
+    """Collection value at each grid step: every card's last close at or before the step"""
+    period = 'day' if days <= cards_app.PRICE_CHART_DAILY_DAYS else 'week'
+    step = 7 if period == 'week' else 1
+    start = cards_app.rollup_period_start(period, datetime.utcnow() - timedelta(days=days))
+    today = datetime.utcnow().date()
+    rows = (app_context.db.session.query(cards_app.PriceRollup.card_id, cards_app.PriceRollup.period_start,
+                                         cards_app.PriceRollup.close)
+            .join(cards_app.Card, cards_app.Card.id == cards_app.PriceRollup.card_id)
+            .filter(cards_app.Card.user_id == user_id, cards_app.PriceRollup.period == period)
+            .order_by(cards_app.PriceRollup.period_start)
+            .all())
+    values = []
+    day = start
+    while day <= today:
+        latest = {}
+        for card_id, period_start, close in rows:
+            if period_start <= day:
+                latest[card_id] = close
+        values.append(round(sum(latest.values()), 2))
+        day += timedelta(days=step)
+    return values
+
+
+def test_empty_collection(app_context):
+    user_id = add_user_with_prices(app_context, {})
+    history = cards_app.portfolio_history(user_id, 30)
+    assert history['resolution'] == 'day'
+    assert history['cards_priced'] == 0
+    assert history['current_value'] == 0 and history['change'] == 0
+    assert history['top_gainers'] == [] and history['top_losers'] == []
+    assert all(point['value'] == 0 for point in history['values'])
+
+
+def test_forward_fill_with_carried_in_prices(app_context):
+    user_id = add_user_with_prices(app_context, {
+        'Old Card': [(90, 4.0), (20, 6.0)],   # Price from before the window is carried in
+        'Riser': [(25, 1.0), (10, 3.0), (2, 8.0)],
+        'Faller': [(15, 10.0), (5, 7.5)],
+    })
+    history = cards_app.portfolio_history(user_id, 30)
+    values = [point['value'] for point in history['values']]
+    assert values == reference_values(app_context, user_id, 30)
+    assert values[0] == 4.0
+    assert history['current_value'] == 6.0 + 8.0 + 7.5
+    assert history['cards_priced'] == 3
+    
+    gainers = {mover['card_name']: mover for mover in history['top_gainers']}
+    assert gainers['Riser']['start_price'] == 1.0 and gainers['Riser']['change'] == 7.0
+    # The carried-in price is the old card's starting point
+    assert gainers['Old Card']['start_price'] == 4.0
+    assert [mover['card_name'] for mover in history['top_losers']] == ['Faller']
+
+
+def test_rising_prices_give_a_rising_curve(app_context):
+    user_id = add_user_with_prices(app_context, {
+        'Steady Climber': [(days_ago, 100.0 - days_ago) for days_ago in range(60, -1, -3)],
+    })
+    values = [point['value'] for point in cards_app.portfolio_history(user_id, 60)['values']]
+    assert values == sorted(values)
+    assert values[-1] == 100.0
+
+
+def test_weekly_resolution_beyond_a_year(app_context):
+    user_id = add_user_with_prices(app_context, {
+        'Ancient': [(700, 2.0), (300, 5.0)],
+        'Newer': [(100, 1.0), (3, 4.0)],
+    })
+    days = cards_app.PRICE_CHART_DAILY_DAYS + 100
+    history = cards_app.portfolio_history(user_id, days)
+    assert history['resolution'] == 'week'
+    values = [point['value'] for point in history['values']]
+    assert values == reference_values(app_context, user_id, days)
+    assert values[0] == 2.0
+    assert history['current_value'] == 9.0
+
+
+def test_long_daily_range_is_downsampled(app_context):
+    user_id = add_user_with_prices(app_context, {
+        'Busy Card': [(days_ago, 10.0 + (days_ago % 7)) for days_ago in range(300, -1, -1)],
+    })
+    history = cards_app.portfolio_history(user_id, 300)
+    assert len(history['values']) == cards_app.app.config['PRICE_CHART_MAX_POINTS']
+    assert history['current_value'] == 10.0
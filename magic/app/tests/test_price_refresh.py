@@ -0,0 +1,125 @@
+import pytest
+import requests
+
+import app as cards_app
+
+
+@pytest.fixture
+def refresh_api(app_context, scryfall_stub, monkeypatch):
+    """Point the price refresh at the stub Scryfall API, one card per chunk and no retries"""
+    monkeypatch.setitem(cards_app.app.config, 'SCRYFALL_API_URL',
+                        f'http://127.0.0.1:{scryfall_stub.server_address[1]}')
+    monkeypatch.setitem(cards_app.app.config, 'SCRYFALL_MAX_RETRIES', 0)
+    monkeypatch.setitem(cards_app.app.config, 'PRICE_REFRESH_CHUNK_SIZE', 1)
+    monkeypatch.setattr(cards_app, '_scryfall_client', None)
+    monkeypatch.setattr(cards_app, '_price_refresh_bucket', cards_app.TokenBucket(0))
+    return scryfall_stub
+
+
+def add_priced_cards(app_context, printings):
+    """printings: [(card name, Scryfall id)], all at $1.00; returns the user id and card ids"""
+    db = app_context.db
+    user = app_context.User(username='collector', password='!')
+    db.session.add(user)
+    db.session.commit()
+    cards = [app_context.Card(user_id=user.id, card_name=name, set_name='Alpha', rarity='rare',
+                              price_usd='1.00', card_data={'scryfall_id': scryfall_id})
+             for name, scryfall_id in printings]
+    db.session.add_all(cards)
+    db.session.commit()
+    return user.id, [card.id for card in cards]
+
+
+def prices(app_context, card_ids):
+    app_context.db.session.expire_all()
+    return [app_context.db.session.get(app_context.Card, card_id).price_usd for card_id in card_ids]
+
+
+def summary_drift(app_context):
+    with app_context.db.engine.connect() as connection:
+        return app_context.repair_collection_summaries(connection, dry_run=True)
+
+
+def collection_requests(server):
+    return sum(1 for path in server.paths if path.startswith('/cards/collection'))
+
+
+PRINTINGS = [('Lightning Bolt', 'lea-161'), ('Black Lotus', 'lea-232'), ('Fire // Ice', 'apc-128')]
+
+
+def test_interrupted_refresh_resumes_from_its_cursor(refresh_api, app_context, monkeypatch):
+    _, card_ids = add_priced_cards(app_context, PRINTINGS)
+    resolve = cards_app.resolve_printing_prices
+    calls = []
+
+    def resolve_then_fail(keys, source, stats):
+        calls.append(keys)
+        if len(calls) == 2:
+            refresh_api.faults.append((500, {}))
+        return resolve(keys, source, stats)
+
+    # The first chunk succeeds, the second fails: the run stops with its cursor on the first card
+    monkeypatch.setattr(cards_app, 'resolve_printing_prices', resolve_then_fail)
+    with pytest.raises(requests.HTTPError):
+        app_context.refresh_prices(source='api', owner='first')
+    monkeypatch.setattr(cards_app, 'resolve_printing_prices', resolve)
+    app_context.db.session.rollback()
+    assert prices(app_context, card_ids) == ['450.00', '1.00', '1.00']
+
+    # Another process cannot take over while the interrupted run's lease lasts
+    assert app_context.refresh_prices(source='api', owner='second') is None
+
+    requests_before = collection_requests(refresh_api)
+    stats = app_context.refresh_prices(source='api', owner='first')
+    assert collection_requests(refresh_api) - requests_before == 2
+    assert stats['cards'] == 3
+    assert stats['changed'] == 3
+    assert prices(app_context, card_ids) == ['450.00', '20000.00', '0.40']
+    assert summary_drift(app_context) == []
+    state, _ = app_context.read_app_state(app_context.PRICE_REFRESH_STATE_KEY)
+    assert state['cursor'] is None
+
+
+def test_refresh_stops_when_its_lease_is_taken(refresh_api, app_context, monkeypatch):
+    _, card_ids = add_priced_cards(app_context, PRINTINGS)
+    resolve = cards_app.resolve_printing_prices
+    calls = []
+
+    def resolve_then_lose_lease(keys, source, stats):
+        calls.append(keys)
+        if len(calls) == 2:
+            # Another process takes the run over between the first and second chunk
+            state, version = cards_app.read_app_state(cards_app.PRICE_REFRESH_STATE_KEY)
+            state['lease_owner'] = 'other'
+            cards_app.write_app_state(cards_app.PRICE_REFRESH_STATE_KEY, state, version)
+            cards_app.db.session.commit()
+        return resolve(keys, source, stats)
+
+    monkeypatch.setattr(cards_app, 'resolve_printing_prices', resolve_then_lose_lease)
+    assert app_context.refresh_prices(source='api', owner='first') is None
+    assert len(calls) == 2
+    # The first chunk was committed; the second was rolled back with the lost lease
+    assert prices(app_context, card_ids) == ['450.00', '1.00', '1.00']
+    assert summary_drift(app_context) == []
+    state, _ = app_context.read_app_state(app_context.PRICE_REFRESH_STATE_KEY)
+    assert state['lease_owner'] == 'other'
+    assert state['cursor'] == card_ids[0]
+
+
+def test_concurrent_price_change_wins_over_refresh(refresh_api, app_context, monkeypatch):
+    user_id, card_ids = add_priced_cards(app_context, PRINTINGS[:1])
+    resolve = cards_app.resolve_printing_prices
+
+    def resolve_after_edit(keys, source, stats):
+        # Someone picks another printing after the chunk was read, before it is written
+        card = cards_app.db.session.get(cards_app.Card, card_ids[0])
+        card.price_usd = '3.00'
+        cards_app.db.session.commit()
+        return resolve(keys, source, stats)
+
+    monkeypatch.setattr(cards_app, 'resolve_printing_prices', resolve_after_edit)
+    stats = app_context.refresh_prices(source='api', owner='first')
+    assert stats['changed'] == 0
+    assert prices(app_context, card_ids) == ['3.00']
+    assert summary_drift(app_context) == []
+    assert app_context.collection_summary(user_id)['total_value'] == pytest.approx(3.0)
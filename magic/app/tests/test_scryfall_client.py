@@ -0,0 +1,84 @@
+import time
+
+import pytest
+import requests
+
+import app as cards_app
+
+
+def stub_client(server, max_retries=3, backoff=0.01, max_retry_after=30, requests_per_second=0):
+    return cards_app.ScryfallClient(f'http://127.0.0.1:{server.server_address[1]}',
+                                    requests_per_second, 2, max_retries, backoff, max_retry_after)
+
+
+def test_named_and_collection_lookups(scryfall_stub):
+    client = stub_client(scryfall_stub)
+    response = client.get('/cards/named?exact=Black Lotus')
+    assert response.status_code == 200
+    assert response.json()['set'] == 'lea'
+    assert client.get('/cards/named?exact=Nonexistent').status_code == 404
+    
+    response = client.post('/cards/collection', json={'identifiers': [{'id': 'm10-146'}, {'id': 'nope'}]})
+    assert [card['name'] for card in response.json()['data']] == ['Lightning Bolt']
+    assert response.json()['not_found'] == [{'id': 'nope'}]
+
+
+def test_429_waits_for_retry_after(scryfall_stub):
+    scryfall_stub.faults.append((429, {'Retry-After': '0.3'}))
+    client = stub_client(scryfall_stub)
+    start = time.monotonic()
+    response = client.get('/cards/named?exact=Black Lotus')
+    assert response.status_code == 200
+    assert time.monotonic() - start >= 0.3
+    assert client.metrics['retries'] == 1
+    assert client.metrics['statuses'] == {'429': 1, '200': 1}
+
+
+def test_retry_after_is_clamped(scryfall_stub):
+    scryfall_stub.faults.append((429, {'Retry-After': '3600'}))
+    client = stub_client(scryfall_stub, max_retry_after=0.1)
+    start = time.monotonic()
+    assert client.get('/cards/named?exact=Black Lotus').status_code == 200
+    assert time.monotonic() - start < 2
+
+
+def test_server_errors_are_retried_then_returned(scryfall_stub):
+    scryfall_stub.faults.extend([(500, {})] * 3)
+    client = stub_client(scryfall_stub, max_retries=2)
+    response = client.get('/cards/named?exact=Black Lotus')
+    assert response.status_code == 500
+    assert client.metrics['retries'] == 2
+    assert len(scryfall_stub.paths) == 3
+
+
+def test_client_errors_are_not_retried(scryfall_stub):
+    scryfall_stub.faults.append((400, {}))
+    client = stub_client(scryfall_stub)
+    assert client.get('/cards/named?exact=Black Lotus').status_code == 400
+    assert client.metrics['retries'] == 0
+
+
+def test_dns_failure_is_not_retried():
+    client = cards_app.ScryfallClient('http://scryfall.invalid', 0, 1, 3, 1.0)
+    start = time.monotonic()
+    with pytest.raises(requests.ConnectionError):
+        client.get('/cards/named?exact=Black Lotus')
+    assert client.metrics['retries'] == 0
+    assert time.monotonic() - start < 1
+
+
+def test_token_bucket_spaces_requests():
+    bucket = cards_app.TokenBucket(rate=20)
+    start = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    # The first token is there up front; the other ten arrive every 50 ms
+    assert 0.45 <= time.monotonic() - start < 1.5
+
+
+def test_rate_limit_applies_to_requests(scryfall_stub):
+    client = stub_client(scryfall_stub, requests_per_second=10)
+    start = time.monotonic()
+    for _ in range(4):
+        client.get('/cards/named?exact=Black Lotus')
+    assert time.monotonic() - start >= 0.29